@@ -1,22 +1,46 @@
 # src/chatgpt_tool.py
 import argparse
 import ast
+import collections.abc
+import concurrent.futures
+import functools
 import hashlib
+import itertools
 import json
 import os
+import re
 import shutil
 import sqlite3
 import string
 import sys
 import tempfile
+import time
 import zipfile
 from datetime import datetime
 
 try:
-    from gazpacho import Soup
-    process_html = True
+    import ijson
 except ImportError:
-    process_html = False
+    ijson = None
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj, indent=False):
+        """
+        Serialize obj to UTF-8 encoded JSON bytes.
+        """
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj, indent=False):
+        """
+        Serialize obj to UTF-8 encoded JSON bytes.
+        """
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode()
 
 """
 ChatGPT Tool
@@ -35,6 +59,8 @@ class Conversation:
 
     TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+    __slots__ = ("table", "id", "create_time", "title")  # one per matching row, so skip the __dict__
+
     def __init__(self, table, id, create_time, title):
         self.table = table
         self.id = id
@@ -42,15 +68,34 @@ class Conversation:
         self.title = title
 
     def __repr__(self):
-        formatted_create_time = datetime.fromtimestamp(self.create_time).strftime(self.TIME_FORMAT)
+        formatted_create_time = self.format_time(self.create_time)
         return f"Conversation(id='{self.id}', create_time='{formatted_create_time}', title='{self.title}')"
 
     def __str__(self):
         return f"{self.title}"
 
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def format_time(cls, timestamp):
+        # time.strftime on a struct_time skips building a datetime object;
+        # adjacent messages often share a timestamp, so results are cached
+        return time.strftime(cls.TIME_FORMAT, time.localtime(float(timestamp)))
+
     def __lt__(self, other):
         return self.create_time < other.create_time
 
+class TableNameTranslation(dict):
+    """
+    str.translate() table that maps every character not allowed in a SQLite table name to '_'.
+    """
+    VALID_CHARS = string.ascii_letters + string.digits + "_"
+
+    def __init__(self):
+        super().__init__((i, chr(i) if chr(i) in self.VALID_CHARS else "_") for i in range(128))
+
+    def __missing__(self, code_point):
+        return "_"  # non-ASCII characters are never valid
+
 class ChatGPTTool:
     DB_NAME = "chatgpt.db"
     DATA_PATH = "data"
@@ -59,6 +104,8 @@ class ChatGPTTool:
     CHAT_TABLE = "conversations"
     USER_TABLE = "user"
 
+    TABLE_NAME_TRANSLATION = TableNameTranslation()
+
     TABLE_MAPPING = {
         "chat": CHAT_TABLE, # ConversationIdentifier
         "user": USER_TABLE,
@@ -70,6 +117,29 @@ class ChatGPTTool:
     EXIT_ERROR = 1
     EXIT_USAGE_ERROR = 2
 
+    CONNECTION_PRAGMAS = (
+        "busy_timeout = 5000",    # first, so the journal mode switch also waits for locks
+        "journal_mode = WAL",     # readers and the importer don't block each other
+        "synchronous = NORMAL",   # WAL is safe without an fsync on every commit
+        "cache_size = -65536",    # 64 MiB page cache
+        "mmap_size = 268435456",  # memory-map up to 256 MiB of the database file
+        "temp_store = MEMORY",
+    )
+
+    STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection (sqlite3 default is 128)
+    FETCH_SIZE = 1024  # rows per fetchmany() batch when streaming tables
+    MAX_SQL_VARIABLES = 999  # bound parameters per statement in older SQLite builds
+    FETCH_BATCH_SIZE = 500  # ids per 'IN (...)' query, below MAX_SQL_VARIABLES
+    EXPORT_BUFFER_SIZE = 1 << 20  # write buffer for exported files
+    IMPORT_BATCH_SIZE = 1000  # objects per executemany() batch during import
+    STREAM_THRESHOLD = 32 << 20  # JSON files larger than this are streamed with ijson
+    EXPORT_WORKERS = min(32, (os.cpu_count() or 1) + 4)  # threads writing exported files
+
+    JSON_DATA_PATTERN = re.compile(r"jsonData\s*=\s*(?=\[)")
+    HTML_ASSET_PATTERN = re.compile(r"<!-- insert (styles\.css|script\.js) here -->")
+    HTML_PAGE_KEY = "chat page"  # template_cache entry for the assembled chat page
+    NULL_KEY = "None"  # stored for null primary key values, as older versions stored every null
+
     # init
     ###########################################################################
     # This section contains the setup for the command-line interface (CLI) and
@@ -83,6 +153,11 @@ class ChatGPTTool:
         self.verbose = False
         self.db_path = db_path or self.DB_NAME
         self.schema_cache = {}  # Initialize the cache dictionary
+        self.known_tables = set()  # Tables in the database being imported into
+        self.conn = None  # Shared connection for the query helpers, opened on first use
+        self.conn_path = None
+        self.template_cache = {}  # Export templates and assets, keyed by path
+        self.insert_query_cache = {}  # INSERT statements, keyed by (table, columns, rows)
         self.args = None  # will be assigned after parsing
 
         # Create the top-level parser
@@ -107,6 +182,12 @@ class ChatGPTTool:
         export_parser = subparsers.add_parser("export", help="Export conversations from the SQLite database")
         export_parser.add_argument("prefixes", nargs="*", help="Export conversations with IDs starting with the specified prefix")
         export_parser.add_argument("--format", choices=['text', 'html', 'json'], default='text', help="Choose an output format")
+        export_parser.add_argument("--compact", action="store_true", help="Write JSON without indentation (--format json only)")
+
+        # Subcommand: dump
+        dump_parser = subparsers.add_parser("dump", help="Export every database table as JSON")
+        dump_parser.add_argument("--compact", dest="indent", action="store_false", help="Write JSON without indentation or line breaks")
+        dump_parser.set_defaults(output_directory=None)  # tables are written to the export directory
 
         # Subcommand: print
         print_parser = subparsers.add_parser('print', help='Print data from the database')
@@ -117,6 +198,17 @@ class ChatGPTTool:
         inspect_parser = subparsers.add_parser("inspect", help="Inspect data files")
         inspect_parser.add_argument("path", nargs="?", default=self.DATA_PATH, help="Data directory for inspection")
 
+        # Subcommand handlers and the parsed arguments passed to each of them
+        self.subcommands = {
+            "import": (self.import_data, ("db_name", "path")),
+            "show": (self.print_tables, ("db_name",)),
+            "info": (self.info, ("db_name",)),
+            "export": (self.export_conversations, ("db_name", "prefixes", "format", "compact")),
+            "dump": (self.export_database_as_json, ("db_name", "output_directory", "indent")),
+            "print": (self.print_conversations, ("db_name", "prefixes", "style")),
+            "inspect": (self.inspect_data, ("path",)),
+        }
+
         self.args = self.parser.parse_args()
         self.verbose = self.args.verbose
         self.db_path = self.args.db_name  # Update self.db_path with parsed value
@@ -133,56 +225,116 @@ class ChatGPTTool:
         """
         Import data from JSON files into the SQLite database.
         """
-        with sqlite3.connect(db_name) as conn:
-            self.create_schema_table(conn.cursor())  # Create schema table
-            self.traverse_files(data_path, self.import_json_data_to_sqlite, conn)
+        with self.connect(db_name) as conn:
+            cursor = conn.cursor()
+            self.create_schema_table(cursor)  # Create schema table
+            self.load_schema_cache(cursor)
+            self.traverse_files(data_path, self.import_json_data_to_sqlite, conn, stream=True)
 
-    def traverse_files(self, path, process_function, *args):
+    def traverse_files(self, path, process_function, *args, stream=False, file_size=None):
         """
         Traverse files in the specified directory and process them.
+
+        file_size is passed for directory entries, whose size is already known from scandir.
         """
-        if os.path.isdir(path):
-            for root, _, filenames in os.walk(path):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    self.traverse_files(file_path, process_function, *args)
-        elif path.endswith(".zip"):
+        if file_size is None and os.path.isdir(path):
+            # Walk the tree with an explicit stack; scandir entries already know their type
+            directories = [path]
+            while directories:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file():
+                            # Symlinked directories are skipped, so a link cycle cannot recurse forever
+                            self.traverse_files(entry.path, process_function, *args, stream=stream, file_size=entry.stat().st_size)
+            return
+
+        # Work out the extension once and hand it down rather than re-splitting the path
+        extension = self.get_file_extension(path)
+        if extension == ".zip":
             if self.verbose:
                 print(f"Reading archive '{path}'")
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(path, "r") as zip_file:
-                    for name in zip_file.namelist():
-                        extracted_file_path = zip_file.extract(name, path=temp_dir)
-                        self.traverse_files(extracted_file_path, process_function, *args)
+            with zipfile.ZipFile(path, "r") as zip_file:
+                for info in zip_file.infolist():
+                    if info.is_dir():
+                        continue
+                    member_extension = self.get_file_extension(info.filename)
+                    if member_extension == ".zip":
+                        # A nested archive has to be a real file to be opened in turn
+                        with tempfile.TemporaryDirectory() as temp_dir:
+                            extracted_file_path = zip_file.extract(info, path=temp_dir)
+                            self.traverse_files(extracted_file_path, process_function, *args, stream=stream)
+                    else:
+                        # Read members straight out of the archive instead of extracting them to disk
+                        member_path = os.path.join(path, info.filename)
+                        with zip_file.open(info) as file:
+                            self.process_file_object(member_path, file, info.file_size, process_function, *args,
+                                                     stream=stream, extension=member_extension)
         else:
-            self.process_file(path, process_function, *args)
+            self.process_file(path, process_function, *args, stream=stream, extension=extension, file_size=file_size)
+
+    @staticmethod
+    def get_file_extension(path):
+        """
+        Return the lowercased extension of a path, including the leading dot.
+        """
+        return os.path.splitext(path)[1].lower()
 
-    def process_file(self, path, process_function, *args):
+    def process_file(self, path, process_function, *args, stream=False, extension=None, file_size=None):
         """
         Process individual files based on their extension.
         """
-        _, file_extension = os.path.splitext(path)
+        if file_size is None:
+            file_size = os.path.getsize(path)
+        with open(path, 'rb') as file:
+            self.process_file_object(path, file, file_size, process_function, *args,
+                                     stream=stream, extension=extension)
+
+    def process_file_object(self, path, file, file_size, process_function, *args, stream=False, extension=None):
+        """
+        Process an open binary file, from disk or from an archive, based on its extension.
+
+        With stream=True, very large JSON arrays are passed on as an iterator
+        of objects when ijson is available.
+        """
+        if extension is None:
+            extension = self.get_file_extension(path)
 
         if self.verbose:
             print(f"Reading file '{path}'")
 
-        if os.path.getsize(path) == 0:
+        if file_size == 0:
             print(f"Warning: Skipping empty file '{path}'")
-        elif file_extension.lower() == ".json":
-            with open(path) as file:
-                json_data = json.load(file)
+        elif extension == ".json":
+            if stream and ijson and file_size > self.STREAM_THRESHOLD and self.starts_with_array(file):
+                # Yield one object at a time instead of loading the whole array
+                process_function(*args, ijson.items(file, 'item', use_float=True), path)
+            else:
+                # Decode straight from bytes; orjson is used when available
+                process_function(*args, json_loads(file.read()), path)
+        elif extension == ".html":
+            html_bytes = file.read()
+            # A byte search finds the assignment without decoding the page; only the tail from
+            # jsonData onwards is decoded, and pages without it are never decoded at all
+            start = html_bytes.find(b"jsonData")
+            html_content = str(memoryview(html_bytes)[start:], "utf-8") if start >= 0 else ""
+            json_data = self.extract_json_from_html(html_content)
+            if json_data:
                 process_function(*args, json_data, path)
-        elif file_extension.lower() == ".html":
-            with open(path) as file:
-                html_content = file.read()
-                json_data = self.extract_json_from_html(html_content)
-                if json_data:
-                    process_function(*args, json_data, path)
-                else:
-                    print("Warning: No JSON data found in the HTML file.")
+            else:
+                print("Warning: No JSON data found in the HTML file.")
         else:
             print(f"Warning: Unexpected file format '{path}'")
 
+    def starts_with_array(self, file):
+        """
+        Check whether a JSON file holds a top-level array, leaving the file at its start.
+        """
+        head = file.read(64).lstrip()
+        file.seek(0)
+        return head.startswith(b"[")
+
     def get_table_name(self, file_path):
         """
         Generate a valid SQLite table name based on the file path.
@@ -191,9 +343,7 @@ class ChatGPTTool:
         suggested_name = os.path.splitext(base_filename)[0]
 
         # Generate a valid sqlite table name
-        valid_chars = set(string.ascii_letters + string.digits + "_")
-        table_name = ''.join(c if c in valid_chars else "_" for c in suggested_name)
-        table_name = table_name.strip("_")
+        table_name = suggested_name.translate(self.TABLE_NAME_TRANSLATION).strip("_")
 
         # Use the mapping if available, or the generated name
         return self.TABLE_MAPPING.get(table_name, table_name)
@@ -206,12 +356,9 @@ class ChatGPTTool:
         version = 1
         hash_value = self.calculate_column_names_hash(column_names)
 
-        while self.table_exists(cursor, versioned_table_name):
-            if versioned_table_name in self.schema_cache and self.schema_cache[versioned_table_name] == hash_value:
-                break
-            hash2 = self.query_single_value("schema", "table_name", versioned_table_name, "hash_value")
-            if hash_value == hash2:
-                self.schema_cache[versioned_table_name] = hash_value
+        # Both lookups are answered from the caches loaded by import_data
+        while versioned_table_name in self.known_tables:
+            if self.schema_cache.get(versioned_table_name) == hash_value:
                 break
             version += 1
             versioned_table_name = f"{table_name}_v{version}"
@@ -241,68 +388,47 @@ class ChatGPTTool:
         """
         Extract JSON data from HTML content if present.
         """
-        # Parse the HTML content using Gazpacho
-        soup = Soup(html_content)
-
-        # Find the <script> tags in the HTML
-        script_tags = soup.find('script', mode='all', partial=False)
-
-        # Search for the <script> tag containing the jsonData variable assignment
-        json_data = None
-        for script_tag in script_tags:
-            if 'jsonData =' in script_tag.text:
-                lines = script_tag.text.split('\n')
-                line_with_json = next(line for line in lines if 'jsonData =' in line)
-                try:
-                    json_start = line_with_json.index("[")
-                    json_end = line_with_json.rindex("]") + 1
-                    json_string = line_with_json[json_start:json_end]
-
-                    # Convert JSON string to Python object (list of dicts)
-                    json_data = json.loads(json_string)
-                    break
-                except (json.JSONDecodeError, ValueError, IndexError) as e:
-                    print("Warning: Unable to extract JSON objects from jsonData variable.")
-                    print("Error:", e)
-                    print(self.truncate_string(json_string, self.get_truncation_length()))
-                    return None
+        # Jump straight to the jsonData assignment instead of parsing the whole document
+        match = self.JSON_DATA_PATTERN.search(html_content)
+        if match is None:
+            print("Warning: No <script> tag containing jsonData variable found.")
+            return []
 
-        if json_data is not None:
-            return json_data
+        # Decode the array in place; anything after its closing bracket is ignored
+        try:
+            json_data, _ = json.JSONDecoder().raw_decode(html_content, match.end())
+        except json.JSONDecodeError as e:
+            print("Warning: Unable to extract JSON objects from jsonData variable.")
+            print("Error:", e)
+            print(self.truncate_string(html_content[match.end():], self.get_truncation_length()))
+            return None
 
-        print("Warning: No <script> tag containing jsonData variable found.")
-        return []
+        return json_data
 
     def extract_json_from_html_re(self, html_content):
-        # Use regular expression to find all <script> tags
-        script_tags = re.findall(r'<script[^>]*>(.*?)</script>', html_content, re.DOTALL)
+        """
+        Extract JSON data from HTML content by locating jsonData assignments directly.
+        """
+        decoder = json.JSONDecoder()
 
         # List to store extracted JSON data
         json_data_list = []
 
-        # Search for <script> tags containing jsonData variable assignment
-        for script_tag in script_tags:
-            # Use regular expressions to extract JSON content
-            json_matches = re.findall(r'jsonData\s*=\s*\[.*?\];', script_tag, re.DOTALL)
-            for json_match in json_matches:
-                try:
-                    # Extract JSON-like content
-                    json_string = json_match.split('=')[1].strip()
-                    # Clean the content by removing JavaScript code
-                    json_string = re.sub(r'(function[^}]+})', '', json_string)
-                    # Attempt to parse the cleaned JSON-like content
-                    json_data = ast.literal_eval(json_string)
-                    json_data_list.append(json_data)
-                except (ValueError, SyntaxError) as e:
-                    print("Warning: Unable to extract JSON objects from HTML file.")
-                    print("Error:", e)
-                    print("Problematic Content:")
-                    print(json_match)  # Print the problematic content
+        # Decode each jsonData array in place, starting at its opening bracket
+        for match in self.JSON_DATA_PATTERN.finditer(html_content):
+            try:
+                json_data, _ = decoder.raw_decode(html_content, match.end())
+                json_data_list.append(json_data)
+            except json.JSONDecodeError as e:
+                print("Warning: Unable to extract JSON objects from HTML file.")
+                print("Error:", e)
+                print("Problematic Content:")
+                print(self.truncate_string(html_content[match.start():], self.get_truncation_length()))
 
         if json_data_list:
             return json_data_list
 
-        print("Warning: No <script> tag containing jsonData variable found.")
+        print("Warning: No jsonData variable found in the HTML file.")
         return []
 
     def import_json_data_to_sqlite(self, conn, json_data, path):
@@ -313,36 +439,62 @@ class ChatGPTTool:
             if self.verbose:
                 print(f"Skipping import for file: {path} (empty JSON data)")
             return
-        elif not isinstance(json_data, list):
+        elif not isinstance(json_data, (list, collections.abc.Iterator)):
             json_data = [json_data]  # Convert single object to a list with a single element
 
         cursor = conn.cursor()
         table_name = self.get_table_name(path)
 
-        for json_object in json_data:
-            self.import_single_json_object(cursor, table_name, json_object)
-
-        conn.commit()  # Commit the transaction
+        # One write transaction per file, taken up front so it never has to upgrade its lock;
+        # each run of same-shaped objects gets its own savepoint
+        cursor.execute("BEGIN IMMEDIATE")
+        for _, json_objects in itertools.groupby(json_data, key=self.get_object_shape):
+            # Bounded batches keep memory flat when the objects are streamed
+            while True:
+                batch = list(itertools.islice(json_objects, self.IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                self.import_json_objects(cursor, table_name, batch)
+        cursor.execute("COMMIT")  # Commit the transaction
         cursor.close()  # Close the cursor
 
-    def import_single_json_object(self, cursor, table_name, json_object):
+    def get_object_shape(self, json_object):
+        """
+        Return the column layout of a JSON object, used to batch objects that share it.
+        """
+        return tuple(json_object) if isinstance(json_object, dict) else None
+
+    def import_json_objects(self, cursor, table_name, json_objects):
         """
-        Import a single JSON object into the SQLite database.
+        Import a batch of JSON objects that share the same keys into the SQLite database.
         """
-        id_field_name, column_names = self.get_id_and_column_names(json_object)
         try:
-            cursor.execute("BEGIN")
-            table_name, hash_value = self.get_versioned_table_name(cursor, table_name, column_names)
+            cursor.execute("SAVEPOINT import_objects")
+            # The schema is resolved once for the whole batch
+            id_field_name, column_names = self.get_id_and_column_names(json_objects[0])
+            versioned_table_name, hash_value = self.get_versioned_table_name(cursor, table_name, column_names)
             # Create the table if necessary
-            if not self.table_exists(cursor, table_name):
-                self.create_table(cursor, table_name, id_field_name, column_names)
-                self.record_schema_change(cursor, hash_value, table_name, column_names)
+            new_table = versioned_table_name not in self.known_tables
+            if new_table:
+                self.create_table(cursor, versioned_table_name, id_field_name, column_names)
+                self.record_schema_change(cursor, hash_value, versioned_table_name, column_names)
             # Insert data into the table
-            self.insert_data_single(cursor, table_name, json_object)
-            cursor.execute("COMMIT")
+            self.insert_data_list(cursor, versioned_table_name, json_objects)
+            cursor.execute("RELEASE import_objects")
+            # Only remember the new table once the savepoint holding it is released
+            if new_table:
+                self.known_tables.add(versioned_table_name)
+                self.schema_cache[versioned_table_name] = hash_value
         except Exception as e:
-            cursor.execute("ROLLBACK")
-            print(f"Error importing data: {e}")
+            # Undo this batch only; the rest of the file is still imported
+            cursor.execute("ROLLBACK TO import_objects")
+            cursor.execute("RELEASE import_objects")
+            if len(json_objects) > 1:
+                # Replay the batch one object at a time so only the failing objects are dropped
+                for json_object in json_objects:
+                    self.import_json_objects(cursor, table_name, [json_object])
+            else:
+                print(f"Error importing data: {e}")
 
     def get_id_and_column_names(self, json_data):
         if isinstance(json_data, list):
@@ -360,9 +512,11 @@ class ChatGPTTool:
         if id_field_name:
             create_table_query += f"{id_field_name} TEXT PRIMARY KEY,"
 
+        # Other columns are untyped so numbers keep their native storage class;
+        # the id stays TEXT so prefix LIKE lookups can use its index
         for column_name in column_names:
             if not id_field_name or id_field_name and id_field_name.lower() != column_name.lower():
-                create_table_query += f"{column_name} TEXT,"
+                create_table_query += f"{column_name},"
 
         if not id_field_name:
             # Define a compound primary key if there's no id field
@@ -375,32 +529,74 @@ class ChatGPTTool:
             print(f"Creating table '{table_name}': {id_field_name}, {column_names}")
         cursor.execute(create_table_query)
 
-    def insert_data_list(self, cursor, table_name, json_data_list):
-        for item in json_data_list:
-            if item:
-                values = self.convert_values(item)
-                self.insert_data(cursor, table_name, item.keys(), values)
-
-    def insert_data_single(self, cursor, table_name, json_data):
-        values = self.convert_values(json_data)
-        self.insert_data(cursor, table_name, json_data.keys(), values)
-
-    def insert_data(self, cursor, table_name, column_names, values):
-        insert_query = f"INSERT OR IGNORE INTO {table_name} ({','.join(column_names)}) VALUES ({','.join(['?'] * len(values))})"
-        cursor.execute(insert_query, values)
+        if id_field_name and table_name.startswith(self.CHAT_TABLE):
+            # Conversation prefix lookups use LIKE, which is case-insensitive and only uses a NOCASE index
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{id_field_name}_nocase ON {table_name} ({id_field_name} COLLATE NOCASE)")
 
-    def convert_values(self, json_data):
+    def insert_data_list(self, cursor, table_name, json_data_list):
+        # Every item is expected to have the same keys as the first one
+        items = [item for item in json_data_list if item]
+        if items:
+            key_positions = self.get_key_positions(items[0])
+            rows = (self.convert_values(item, key_positions) for item in items)
+            self.insert_data_many(cursor, table_name, items[0].keys(), rows)
+
+    def get_key_positions(self, json_data):
+        """
+        Return the positions of the primary key columns, matching the layout create_table uses.
+        """
+        id_field_name, column_names = self.get_id_and_column_names(json_data)
+        if id_field_name:
+            return (column_names.index(id_field_name),)
+        return tuple(range(len(column_names)))  # compound primary key over every column
+
+    def insert_data_many(self, cursor, table_name, column_names, rows):
+        column_names = tuple(column_names)
+        # Pack as many rows into each statement as the bound parameter limit allows
+        rows_per_insert = max(1, self.MAX_SQL_VARIABLES // len(column_names))
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, rows_per_insert))
+            if len(chunk) < rows_per_insert:
+                # The final partial chunk goes through the single-row statement
+                if chunk:
+                    cursor.executemany(self.get_insert_query(table_name, column_names), chunk)
+                break
+            values = [value for row in chunk for value in row]
+            cursor.execute(self.get_insert_query(table_name, column_names, rows_per_insert), values)
+
+    def get_insert_query(self, table_name, column_names, row_count=1):
+        # Reusing the identical SQL string also lets sqlite3's statement cache hit
+        key = (table_name, tuple(column_names), row_count)
+        insert_query = self.insert_query_cache.get(key)
+        if insert_query is None:
+            placeholders = f"({','.join(['?'] * len(key[1]))})"
+            insert_query = f"INSERT OR IGNORE INTO {table_name} ({','.join(key[1])}) VALUES {','.join([placeholders] * row_count)}"
+            self.insert_query_cache[key] = insert_query
+        return insert_query
+
+    def convert_values(self, json_data, key_positions=()):
         converted_values = []
-        for key, value in json_data.items():
+        append = converted_values.append  # called once per value, so bind it locally
+        for value in json_data.values():
             # value_type = type(value).__name__
-            # print(f"Value for key '{key}' has type: {value_type}")
-            if isinstance(value, (str, int, float, bool)):
-                converted_values.append(value)
+            # print(f"Value type: {value_type}")
+            if value is None or isinstance(value, (str, int, float, bool)):
+                append(value)  # SQLite stores these natively; None becomes NULL
             elif isinstance(value, datetime):
-                converted_values.append(value.strftime('%Y-%m-%d %H:%M:%S'))
+                # Same text as Conversation.TIME_FORMAT, without strftime's locale handling
+                append(value.replace(tzinfo=None).isoformat(sep=" ", timespec="seconds"))
+            elif isinstance(value, (dict, list)):
+                # Store nested structures as JSON so they can be read back with json_loads
+                append(json_dumps(value).decode())
             else:
                 # Handle other data types here, or convert them to strings
-                converted_values.append(str(value))
+                append(str(value))
+        # NULLs never compare equal in a primary key, so INSERT OR IGNORE would keep every
+        # repeat of a row with a null key; key columns get a value that deduplicates instead
+        for position in key_positions:
+            if converted_values[position] is None:
+                converted_values[position] = self.NULL_KEY
         return converted_values
 
     # info
@@ -409,17 +605,41 @@ class ChatGPTTool:
     # `info`, `get_table_names`, `get_table_count`, and others.
     ###########################################################################
 
+    def connect(self, db_name):
+        """
+        Open a SQLite connection with the tool's performance settings applied.
+        """
+        conn = sqlite3.connect(db_name, cached_statements=self.STATEMENT_CACHE_SIZE)
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+
+    def get_connection(self):
+        """
+        Return the shared connection to self.db_path, reopening it if the path changed.
+        """
+        if self.conn is None or self.conn_path != self.db_path:
+            self.close_connection()
+            self.conn = self.connect(self.db_path)
+            self.conn_path = self.db_path
+        return self.conn
+
+    def close_connection(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
     def info(self, db_name):
         # Connect to the database
-        conn = sqlite3.connect(db_name)
+        conn = self.connect(db_name)
         cursor = conn.cursor()
 
         # Retrieve statistics about the tables
         tables = self.get_table_names(cursor)
+        table_columns = self.get_all_column_names(cursor)
         table_stats = []
         for table in tables:
-            column_names = self.get_column_names(cursor, table)
-            table_stats.append((table, column_names, self.get_table_count(cursor, table)))
+            table_stats.append((table, table_columns.get(table, []), self.get_table_count(cursor, table)))
 
         # Display the statistics
         print("Database Information:")
@@ -478,18 +698,31 @@ class ChatGPTTool:
         columns_info = cursor.fetchall()
         return [column_info[1] for column_info in columns_info]
 
+    def get_all_column_names(self, cursor):
+        # One pragma_table_info join instead of a PRAGMA statement per table
+        cursor.execute(
+            "SELECT m.name, p.name FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p "
+            "WHERE m.type = 'table' ORDER BY m.name, p.cid"
+        )
+        table_columns = {}
+        for table_name, column_name in cursor:
+            table_columns.setdefault(table_name, []).append(column_name)
+        return table_columns
+
     def get_table_count(self, cursor, table_name):
         cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
         return cursor.fetchone()[0]
 
     def table_exists(self, cursor, table_name):
+        # Tables seen by the current import are answered from the cache without a query
+        if table_name in self.known_tables:
+            return True
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
         existing_table = cursor.fetchone()
         return existing_table is not None
 
     def query_table(self, table_name, condition_field=None, condition_value=None, fetch_one=False):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
 
         try:
             if condition_field and condition_value:
@@ -516,11 +749,12 @@ class ChatGPTTool:
             result = None
             # Raise a custom exception or re-raise the exception here if needed
         finally:
-            conn.close()
+            cursor.close()
 
         return result
 
     def query_single_value(self, table_name, condition_field, condition_value, value_field):
+        # query_table reads through the shared connection, so no new connection is opened
         result = self.query_table(table_name, condition_field, condition_value, fetch_one=True)
         if result:
             return result.get(value_field, None)
@@ -544,15 +778,39 @@ class ChatGPTTool:
         create_table_query += "table_name TEXT,"
         create_table_query += "column_names TEXT)"
         cursor.execute(create_table_query)
+        # Versioned table names are resolved from schema_cache; get_schema_hash_value still
+        # searches the schema table by table_name for tables the cache doesn't know
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.SCHEMA_TABLE}_table_name ON {self.SCHEMA_TABLE} (table_name)")
+
+    def load_schema_cache(self, cursor):
+        # Remember the existing tables and their schema hashes for this import
+        self.known_tables = set(self.get_table_names(cursor))
+        cursor.execute(f"SELECT table_name, hash_value FROM {self.SCHEMA_TABLE}")
+        self.schema_cache = dict(cursor.fetchall())
 
     def record_schema_change(self, cursor, hash_value, table_name, column_names):
         cursor.execute(f"INSERT OR IGNORE INTO {self.SCHEMA_TABLE} (hash_value, table_name, column_names) VALUES (?, ?, ?)", (hash_value, table_name, ",".join(column_names)))
 
     def calculate_column_names_hash(self, column_names):
         # Calculate a hash of the column names
-        column_names = sorted(column_names) if column_names else []
+        return self.hash_sorted_column_names(tuple(sorted(column_names)) if column_names else ())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def hash_sorted_column_names(column_names):
+        # MD5 is kept so hashes match those already stored in the schema table
         return hashlib.md5("".join(column_names).encode()).hexdigest()
 
+    def get_schema_hash_value(self, cursor, table_name):
+        # The import keeps schema_cache current; otherwise read through the caller's open cursor
+        if table_name in self.schema_cache:
+            return self.schema_cache[table_name]
+        cursor.execute(f"SELECT hash_value FROM {self.SCHEMA_TABLE} WHERE table_name = ?", (table_name,))
+        result = cursor.fetchone()
+        if result:
+            return result[0]
+        return None
+
     def get_schema_by_hash_value(self, hash_value):
         result = self.query_table("schema", "hash_value", hash_value)
 
@@ -602,29 +860,51 @@ class ChatGPTTool:
     ###########################################################################
 
     def print_tables(self, db_name, file_handle=sys.stdout):
-        conn = sqlite3.connect(db_name)
+        conn = self.connect(db_name)
         cursor = conn.cursor()
 
         truncation_length = self.get_truncation_length()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
+        tables = self.get_table_names(cursor)
+        table_columns = self.get_all_column_names(cursor)
 
-        for table in tables:
-            table_name = table[0]
+        for table_name in tables:
             print(f"Table: {table_name}", file=file_handle)
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
-            column_names = [column[1] for column in columns]
+            column_names = table_columns.get(table_name, [])
             print(self.truncate_string(str(column_names), truncation_length), file=file_handle)
             cursor.execute(f"SELECT * FROM {table_name}")
-            rows = cursor.fetchall()
-            for row in rows:
-                print(self.truncate_string(str(row), truncation_length), file=file_handle)
-            print(file_handle)
+            # Stream the rows in batches so large tables never sit in memory at once
+            while True:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+                if not rows:
+                    break
+                # One write per batch instead of one print() per row
+                file_handle.write("".join([self.format_row(row, truncation_length) + "\n" for row in rows]))
+            print(file=file_handle)
 
         conn.close()
 
+    def format_row(self, row, max_length):
+        """
+        Format a row like str(row), truncated to max_length without building the full text.
+        """
+        parts = []
+        length = 1  # opening parenthesis
+        for value in row:
+            if isinstance(value, str) and len(value) > max_length:
+                # Anything past max_length is cut off anyway, but a quote in that part
+                # changes which quote repr() picks, so such values are kept whole
+                if value.find("'", max_length) < 0 and value.find('"', max_length) < 0:
+                    value = value[:max_length]
+            text = repr(value)
+            length += len(text) + (2 if parts else 0)
+            parts.append(text)
+            if length > max_length:
+                return self.truncate_string("(" + ", ".join(parts), max_length)
+        if len(parts) == 1:
+            return self.truncate_string(f"({parts[0]},)", max_length)
+        return self.truncate_string("(" + ", ".join(parts) + ")", max_length)
+
     def truncate_string(self, string, max_length):
         if len(string) <= max_length:
             return string
@@ -638,7 +918,7 @@ class ChatGPTTool:
         """
         Prints conversations from the SQLite database filtered by prefixes and style.
         """
-        conn = sqlite3.connect(db_name)
+        conn = self.connect(db_name)
         cursor = conn.cursor()
 
         all_conversations = self.get_matching_conversations(cursor, prefixes)
@@ -646,9 +926,11 @@ class ChatGPTTool:
         divider = Conversation.DISPLAY_STYLES.get(style, {}).get('divider', '')
 
         if all_conversations:
-            for i, conversation in enumerate(all_conversations):
-                self.print_single_conversation(cursor, conversation, style, file_handle)
-                if i < len(all_conversations) - 1 and divider:
+            print_conversation_data = self.print_conversation_data
+            last = len(all_conversations) - 1
+            for i, (conversation, conversation_data) in enumerate(self.fetch_conversations(cursor, all_conversations)):
+                print_conversation_data(conversation, conversation_data, style, file_handle)
+                if i < last and divider:
                     print(divider, file=file_handle)
         else:
             print(f"No conversations found with prefixes: {', '.join(prefixes)}", file=file_handle)
@@ -664,45 +946,80 @@ class ChatGPTTool:
             prefixes = []
 
         tables = self.get_table_names(cursor, filter_prefix=self.CHAT_TABLE)
-        matching_conversations = []
-        unique_ids = set()
-
-        if prefixes:
-            for prefix in prefixes:
-                for table in tables:
-                    cursor.execute(f"SELECT id, create_time, title FROM {table} WHERE id LIKE ?", (f"{prefix}%",))
-                    for row in cursor.fetchall():
-                        if row[0] not in unique_ids:
-                            unique_ids.add(row[0])
-                            matching_conversations.append(Conversation(table, row[0], float(row[1]), row[2]))
-        else:
-            for table in tables:
-                cursor.execute(f"SELECT id, create_time, title FROM {table}")
-                for row in cursor.fetchall():
-                    if row[0] not in unique_ids:
-                        unique_ids.add(row[0])
-                        matching_conversations.append(Conversation(table, row[0], float(row[1]), row[2]))
+        if not tables:
+            return []
 
-        matching_conversations.sort(key=lambda conv: conv.create_time)  # Sort by create_time
-        return matching_conversations
+        # Build the prefix filter once and scan every table in a single UNION ALL query
+        where_clause = ""
+        parameters = tuple(f"{prefix}%" for prefix in prefixes)
+        if parameters:
+            where_clause = " WHERE " + " OR ".join(["id LIKE ?"] * len(parameters))
+        union_query = " UNION ALL ".join(
+            f"SELECT id, create_time, title, '{table}' AS source_table, {order} AS table_order FROM {table}{where_clause}"
+            for order, table in enumerate(tables)
+        )
+
+        # Let SQLite dedup and sort; MIN() keeps the row from the first table an id appears in
+        query = (
+            f"SELECT id, create_time, title, source_table, MIN(table_order) FROM ({union_query}) "
+            "GROUP BY id ORDER BY CAST(create_time AS REAL), MIN(table_order)"
+        )
+        cursor.execute(query, parameters * len(tables))
+        return [Conversation(table, id, float(create_time), title) for id, create_time, title, table, _ in cursor]
 
     def fetch_conversation(self, cursor, conversation):
         """
         Fetches a single conversation from the database.
         """
-        cursor.execute(f"SELECT * FROM {conversation.table} WHERE id = ?", (conversation.id,))
+        # IS also matches a NULL id, which '=' never does
+        cursor.execute(f"SELECT * FROM {conversation.table} WHERE id IS ?", (conversation.id,))
         row = cursor.fetchone()
         if row:
             column_names = [column[0] for column in cursor.description]
             return dict(zip(column_names, row))
         return None
 
+    def fetch_conversations(self, cursor, conversations):
+        """
+        Yields (conversation, conversation_data) pairs in order, fetching rows in batches.
+
+        Each batch issues one 'WHERE id IN (...)' query per table instead of one query per
+        conversation. conversation_data is None for conversations that no longer exist.
+        """
+        for start in range(0, len(conversations), self.FETCH_BATCH_SIZE):
+            batch = conversations[start:start + self.FETCH_BATCH_SIZE]
+
+            ids_by_table = {}
+            for conversation in batch:
+                ids_by_table.setdefault(conversation.table, []).append(conversation.id)
+
+            rows_by_key = {}
+            for table, ids in ids_by_table.items():
+                placeholders = ",".join("?" * len(ids))
+                cursor.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", ids)
+                column_names = [column[0] for column in cursor.description]
+                for row in cursor:
+                    conversation_data = dict(zip(column_names, row))
+                    rows_by_key[(table, conversation_data['id'])] = conversation_data
+
+            for conversation in batch:
+                conversation_data = rows_by_key.get((conversation.table, conversation.id))
+                if conversation_data is None:
+                    # Ids the IN () query can't match, such as NULL, are looked up on their own
+                    conversation_data = self.fetch_conversation(cursor, conversation)
+                yield conversation, conversation_data
 
     def print_single_conversation(self, cursor, conversation, style, file_handle=None):
         """
         Prints a single conversation.
         """
         conversation_data = self.fetch_conversation(cursor, conversation)
+        self.print_conversation_data(conversation, conversation_data, style, file_handle)
+
+    def print_conversation_data(self, conversation, conversation_data, style, file_handle=None):
+        """
+        Prints a conversation that has already been fetched from the database.
+        """
         if conversation_data:
             self.print_header(conversation_data, style, file_handle)
             self.print_messages(conversation_data, style, file_handle)
@@ -719,28 +1036,28 @@ class ChatGPTTool:
         """
         divider = Conversation.DISPLAY_STYLES[style]['divider']
         blank = Conversation.DISPLAY_STYLES[style]['blank']
-        output = ""
+        lines = []
         if style == 'raw':
-            for key, value in conversation_data.items():
-                if key != 'mapping':
-                    output += f"{key}: {value}\n"
+            lines.extend(f"{key}: {value}\n" for key, value in conversation_data.items() if key != 'mapping')
         else:
-            output += f"Title: {conversation_data['title']}\n"
-            output += f"ID: {conversation_data['id']}\n"
+            lines.append(f"Title: {conversation_data['title'] or ''}\n")  # NULL for untitled conversations
+            lines.append(f"ID: {conversation_data['id']}\n")
             if style != 'default':
-                output += f"Create time: {datetime.fromtimestamp(float(conversation_data['create_time'])).strftime(Conversation.TIME_FORMAT)}\n"
-                output += f"Update time: {datetime.fromtimestamp(float(conversation_data['update_time'])).strftime(Conversation.TIME_FORMAT)}\n"
+                lines.append(f"Create time: {Conversation.format_time(conversation_data['create_time'])}\n")
+                lines.append(f"Update time: {Conversation.format_time(conversation_data['update_time'])}\n")
             if style == 'full':
-                output += f"Current node: {conversation_data['current_node']}\n"
-                output += f"Moderation results: {conversation_data['moderation_results']}\n"
-                output += f"Plugin IDs: {conversation_data['plugin_ids']}\n"
+                lines.append(f"Current node: {conversation_data['current_node']}\n")
+                lines.append(f"Moderation results: {conversation_data['moderation_results']}\n")
+                lines.append(f"Plugin IDs: {conversation_data['plugin_ids']}\n")
                 if "conversation_id" in conversation_data:
-                    output += f"Conversation ID: {conversation_data['conversation_id']}\n"
+                    lines.append(f"Conversation ID: {conversation_data['conversation_id']}\n")
                 if "conversation_template_id" in conversation_data:
-                    output += f"Conversation Template ID: {conversation_data['conversation_template_id']}\n"
+                    lines.append(f"Conversation Template ID: {conversation_data['conversation_template_id']}\n")
         if divider or blank:
-            output += "\n"
+            lines.append("\n")
 
+        # Join once, as print_messages does
+        output = "".join(lines)
         if file_handle:
             file_handle.write(output)
         else:
@@ -751,59 +1068,78 @@ class ChatGPTTool:
         Prints the messages of a conversation.
         """
         blank = Conversation.DISPLAY_STYLES[style]['blank']
-        messages = self.get_conversation_messages(conversation_data)
-        output = ""
-        if style == 'raw':
-            mapping = ast.literal_eval(conversation_data['mapping'])
-
-        if messages:
-            for message in messages:
-                author = str(message['author'])
-                text = message['text']
-                if style == 'raw':
-                    id = message['id']
-                    node = mapping[id]
-                    output += f"node: {node}\n"
-                elif style == 'irc' or style == 'full':
-                    timestamp = message['timestamp'] or 0
-                    timestamp = datetime.fromtimestamp(float(timestamp)).strftime(Conversation.TIME_FORMAT)
-                    output += f"{timestamp} <{author}> {text}\n"
-                else:  # default style
-                    if author == "system":
-                        continue
-                    elif author == "assistant":
-                        author = "ChatGPT"
-                    output += f"{author}: {text}\n"
-                if blank:
-                    output += "\n"
-
+        messages, mapping = self.get_conversation_messages(conversation_data)
+
+        # Pick the formatter once instead of re-checking the style for every message
+        format_message = self.get_message_formatter(style)
+        lines = []
+        for message in messages:
+            line = format_message(message, mapping)
+            if line is None:
+                continue
+            lines.append(line)
+            if blank:
+                lines.append("\n")
+
+        # Join once and hand the whole conversation to a single write
+        output = "".join(lines)
         if file_handle:
             file_handle.write(output)
         else:
             print(output)
 
+    def get_message_formatter(self, style):
+        """
+        Returns the function that formats a single message in the given style.
+        """
+        return {
+            'default': self.format_message_default,
+            'irc': self.format_message_irc,
+            'full': self.format_message_irc,
+            'raw': self.format_message_raw,
+        }[style]
+
+    def format_message_default(self, message, mapping):
+        _, author, _, text = message
+        author = str(author)
+        if author == "system":
+            return None
+        elif author == "assistant":
+            author = "ChatGPT"
+        return f"{author}: {text}\n"
+
+    def format_message_irc(self, message, mapping):
+        _, author, timestamp, text = message
+        return f"{Conversation.format_time(timestamp or 0)} <{author}> {text}\n"
+
+    def format_message_raw(self, message, mapping):
+        return f"node: {mapping[message[0]]}\n"
+
     def get_conversation_messages(self, conversation_data):
         """
-        Retrieves the messages from a conversation.
+        Retrieves the messages from a conversation as (id, author, timestamp, text) tuples,
+        along with the parsed mapping they were read from.
         """
         if 'mapping' not in conversation_data or not conversation_data['mapping']:
             print(f"Warning: 'mapping' field is missing or empty in conversation ID: {conversation_data['id']}")
-            return []
+            return [], {}
 
         try:
-            # mapping = json.loads(conversation['mapping'])
-            mapping = ast.literal_eval(conversation_data['mapping'])
-        except json.JSONDecodeError as e:
+            mapping = self.parse_mapping(conversation_data['mapping'])
+        except (ValueError, SyntaxError) as e:
             print(f"Error decoding 'mapping' field for conversation ID: {conversation_data['id']}")
-            print(f"JSON Decode Error: {e}")
+            print(f"Decode Error: {e}")
             print(f"Mapping string: {conversation_data['mapping']}")
-            return []
+            return [], {}
 
+        # Walk from the current node up to the root, then reverse in place
         messages = []
         current_node = conversation_data['current_node']
         while current_node is not None:
             node = mapping.get(current_node)
-            if node and "message" in node and node["message"]:
+            if node is None:
+                break  # dangling parent reference
+            if "message" in node and node["message"]:
                 message = node["message"]
                 if "author" in message and "content" in message:
                     author = message["author"]["role"]
@@ -811,10 +1147,23 @@ class ChatGPTTool:
                     content = message["content"]
                     if "content_type" in content and content["content_type"] == "text" and "parts" in content:
                         text = content["parts"][0]
-                        messages.append({"id": current_node, "author": author, "timestamp": timestamp, "text": text})
+                        messages.append((current_node, author, timestamp, text))
             current_node = node.get("parent")
 
-        return messages[::-1]
+        messages.reverse()
+        return messages, mapping
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def parse_mapping(mapping_string):
+        """
+        Parses a stored 'mapping' field back into a dict. Results are cached and must not be modified.
+        """
+        try:
+            return json_loads(mapping_string)
+        except ValueError:
+            # Databases imported by older versions stored the Python repr instead of JSON
+            return ast.literal_eval(mapping_string)
 
     # export
     ###########################################################################
@@ -823,124 +1172,229 @@ class ChatGPTTool:
     # `export_conversation_plain_text`, and others fit in this section.
     ###########################################################################
 
-    def export_conversations(self, db_name, prefixes=None, export_format="text"):
+    def export_conversations(self, db_name, prefixes=None, export_format="text", compact=False):
         """
         Export conversations from the SQLite database based on specified prefixes and export format.
         """
-        conn = sqlite3.connect(db_name)
+        if compact and export_format != "json":
+            print("Error: --compact only applies to --format json")
+            return self.EXIT_USAGE_ERROR
+
+        conn = self.connect(db_name)
         cursor = conn.cursor()
 
-        all_conversations = self.get_matching_conversations(cursor, prefixes)
+        try:
+            # Run every read of the export in one transaction: one lock, one consistent snapshot
+            cursor.execute("BEGIN")
 
-        print(f"Prefixes: {prefixes}")
-        print(f"Total conversations to export: {len(all_conversations)}")
+            all_conversations = self.get_matching_conversations(cursor, prefixes)
 
-        if not os.path.exists(self.EXPORT_PATH):
-            os.makedirs(self.EXPORT_PATH)
+            print(f"Prefixes: {prefixes}")
+            print(f"Total conversations to export: {len(all_conversations)}")
 
-        if export_format == "json":
-            self.export_conversations_as_json(cursor, all_conversations)
-        elif export_format == "html":
-            self.export_conversations_as_html(cursor, all_conversations)
-        elif export_format == "text":
-            self.export_conversations_as_plain_text(cursor, all_conversations)
-        else:
-            print(f"Unknown export format: {export_format}")
+            if not os.path.exists(self.EXPORT_PATH):
+                os.makedirs(self.EXPORT_PATH)
 
-        conn.close()
+            if export_format == "json":
+                self.export_conversations_as_json(cursor, all_conversations, indent=not compact)
+            elif export_format == "html":
+                self.export_conversations_as_html(cursor, all_conversations)
+            elif export_format == "text":
+                self.export_conversations_as_plain_text(cursor, all_conversations)
+            else:
+                print(f"Unknown export format: {export_format}")
 
-    def export_conversations_as_json(self, cursor, all_conversations):
-        for conversation in all_conversations:
-            output_file = os.path.join(self.EXPORT_PATH, f"{conversation.id}.json")
-            if self.verbose:
-                print(f"Exporting {conversation} to {output_file}")
-            with open(output_file, 'w', encoding='utf-8') as file_handle:
-                self.print_single_conversation(cursor, conversation, 'json', file_handle)
+            cursor.execute("COMMIT")
+        finally:
+            # A failed export still releases its read transaction and the connection
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+
+    def export_conversations_as_json(self, cursor, all_conversations, indent=True):
+        self.run_export_tasks(
+            (self.write_conversation_as_json, conversation, conversation_data, indent)
+            for conversation, conversation_data in self.fetch_conversations(cursor, all_conversations)
+        )
+
+    def write_conversation_as_json(self, conversation, conversation_data, indent=True):
+        """
+        Writes an already fetched conversation to a JSON file.
+        """
+        output_file = os.path.join(self.EXPORT_PATH, f"{conversation.id}.json")
+        if self.verbose:
+            print(f"Exporting {conversation} to {output_file}")
+        if conversation_data is None:
+            print(f"Conversation not found: {conversation.id} in {conversation.table}")
+            return
+        if conversation_data.get('mapping'):
+            conversation_data['mapping'] = self.parse_mapping(conversation_data['mapping'])
+        # Serialize once and hand the whole document to the file in a single write
+        with open(output_file, 'wb', buffering=self.EXPORT_BUFFER_SIZE) as file_handle:
+            file_handle.write(json_dumps(conversation_data, indent=indent))
+
+    def run_export_tasks(self, tasks):
+        """
+        Runs (function, *args) export tasks on a thread pool.
+
+        Tasks are consumed lazily on the calling thread, so database reads stay on the
+        connection's own thread while formatting and file writes overlap in the pool.
+        At most twice EXPORT_WORKERS tasks are in flight at any time.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.EXPORT_WORKERS) as executor:
+            pending = set()
+            for function, *args in tasks:
+                if len(pending) >= 2 * self.EXPORT_WORKERS:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        future.result()  # re-raise any error from the worker
+                pending.add(executor.submit(function, *args))
+            for future in concurrent.futures.as_completed(pending):
+                future.result()
 
     def export_conversations_as_html(self, cursor, all_conversations):
         """
         Exports the given conversations to separate HTML files.
         """
-        for conversation in all_conversations:
-            self.export_single_conversation_as_html(cursor, conversation)
+        # Build the page up front so the workers only ever read the cache
+        self.load_html_page()
+        self.run_export_tasks(
+            (self.write_conversation_as_html, conversation, conversation_data)
+            for conversation, conversation_data in self.fetch_conversations(cursor, all_conversations)
+        )
         self.generate_index_html(all_conversations)
 
-    def export_single_conversation_as_html(self, cursor, conversation):
+    def load_html_page(self):
         """
-        Exports a single conversation to an HTML file.
-        """
-
-        # Read template HTML, styles, & script
-        with open('templates/chat.html', 'r') as file:
-            html_template = file.read()
-        with open('assets/styles.css', 'r') as file:
-            styles = file.read()
-        with open('assets/script.js', 'r') as file:
-            script = file.read()
+        Returns the chat page as encoded pieces around the title and the JSON data.
 
-        # Prepare the conversation data
-        full_conv = self.fetch_conversation(cursor, conversation)
-        if full_conv:
-            conv_dict = {
-                "title": conversation.title,
-                "current_node": full_conv["current_node"],
-                "mapping": ast.literal_eval(full_conv["mapping"])  # Use ast.literal_eval for safety
+        Styles and script are inlined once and the result is cached, so each exported
+        conversation only writes its own title and data between the fixed pieces.
+        """
+        page = self.template_cache.get(self.HTML_PAGE_KEY)
+        if page is None:
+            # Read template HTML, styles, & script
+            html_template = self.load_template(os.path.join('templates', 'chat.html'))
+            assets = {
+                'styles.css': self.load_template(os.path.join('assets', 'styles.css')),
+                'script.js': self.load_template(os.path.join('assets', 'script.js')),
             }
-            conversations_data = [conv_dict]
-
-            # Inject title, JSON data, styles, and script into the template
-            html_content = html_template.replace('<!-- insert title here -->', conversation.title)
-            html_content = html_content.replace('<!-- insert styles.css here -->', styles)
-            html_content = html_content.replace('<!-- insert [json] here -->', json.dumps(conversations_data))
-            html_content = html_content.replace('<!-- insert script.js here -->', script)
+            html_content = self.HTML_ASSET_PATTERN.sub(lambda match: assets[match.group(1)], html_template)
+            before_title, _, rest = html_content.partition('<!-- insert title here -->')
+            before_json, _, after_json = rest.partition('<!-- insert [json] here -->')
+            page = tuple(part.encode('utf-8') for part in (before_title, before_json, after_json))
+            self.template_cache[self.HTML_PAGE_KEY] = page
+        return page
+
+    def write_conversation_as_html(self, conversation, full_conv):
+        """
+        Writes an already fetched conversation to an HTML file.
+        """
+        if not full_conv:
+            return
 
-            # Write the final HTML to a file
-            file_name = os.path.join(self.EXPORT_PATH, f'{conversation.id}.html')
-            with open(file_name, 'w') as file:
-                file.write(html_content)
+        before_title, before_json, after_json = self.load_html_page()
+        title = conversation.title or ""  # NULL for untitled conversations
 
-            print(f'HTML file for conversation "{conversation.id}" generated successfully.')
+        # Prepare the conversation data
+        conv_dict = {
+            "title": title,
+            "current_node": full_conv["current_node"],
+            "mapping": self.parse_mapping(full_conv["mapping"])
+        }
+        conversations_data = [conv_dict]
+
+        # Write the final HTML to a file; the JSON data goes in as bytes, without decoding it to str
+        file_name = os.path.join(self.EXPORT_PATH, f'{conversation.id}.html')
+        with open(file_name, 'wb', buffering=self.EXPORT_BUFFER_SIZE) as file:
+            file.write(before_title)
+            file.write(title.encode('utf-8'))
+            file.write(before_json)
+            file.write(json_dumps(conversations_data))
+            file.write(after_json)
+
+        print(f'HTML file for conversation "{conversation.id}" generated successfully.')
+
+    def load_template(self, path):
+        """
+        Returns the contents of a template or asset file, reading it from disk only once.
+        """
+        content = self.template_cache.get(path)
+        if content is None:
+            with open(path, 'r', encoding='utf-8') as file:
+                content = file.read()
+            self.template_cache[path] = content
+        return content
 
     def export_conversations_as_plain_text(self, cursor, all_conversations):
-        for conversation in all_conversations:
-            output_file = os.path.join(self.EXPORT_PATH, f"{conversation.id}.txt")
-            if self.verbose:
-                print(f"Exporting {conversation} to {output_file}")
-            with open(output_file, 'w', encoding='utf-8') as file_handle:
-                self.print_single_conversation(cursor, conversation, 'full', file_handle)
+        self.run_export_tasks(
+            (self.write_conversation_as_plain_text, conversation, conversation_data)
+            for conversation, conversation_data in self.fetch_conversations(cursor, all_conversations)
+        )
+
+    def write_conversation_as_plain_text(self, conversation, conversation_data):
+        """
+        Writes an already fetched conversation to a text file in the 'full' style.
+        """
+        output_file = os.path.join(self.EXPORT_PATH, f"{conversation.id}.txt")
+        if self.verbose:
+            print(f"Exporting {conversation} to {output_file}")
+        with open(output_file, 'w', encoding='utf-8', buffering=self.EXPORT_BUFFER_SIZE) as file_handle:
+            self.print_conversation_data(conversation, conversation_data, 'full', file_handle)
 
     def export_table_as_json(self, cursor, table_name):
+        """
+        Yields the rows of a table as dicts, one at a time.
+        """
         cursor.execute(f"SELECT * FROM {table_name}")
-        rows = cursor.fetchall()
-
         column_names = [column[0] for column in cursor.description]
-        json_data = []
 
-        for row in rows:
-            conversation = dict(zip(column_names, row))
-            json_data.append(conversation)
+        # Pull rows from SQLite in batches; only one batch is held at a time
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            # Build the row dicts in C with map() rather than a Python-level loop
+            yield from map(dict, map(zip, itertools.repeat(column_names), rows))
 
-        return json_data
+    def export_table_rows_as_json(self, cursor, table_name, indent=True):
+        """
+        Yields the rows of a table as serialized JSON objects (bytes).
+        """
+        for row in self.export_table_as_json(cursor, table_name):
+            yield json_dumps(row, indent=indent)
 
-    def export_database_as_json(self, db_name, output_directory=None):
+    def export_database_as_json(self, db_name, output_directory=None, indent=True):
         output_directory = output_directory or self.EXPORT_PATH
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        conn = sqlite3.connect(db_name)
+        conn = self.connect(db_name)
         cursor = conn.cursor()
 
         tables = self.get_table_names(cursor)
 
+        # Compact output is a single line; indented output puts each row on its own lines
+        opening, separator, closing = (b"[\n", b",\n", b"\n]\n") if indent else (b"[", b",", b"]")
+
         for table in tables:
-            json_data = self.export_table_as_json(cursor, table)
+            rows = self.export_table_rows_as_json(cursor, table, indent)
+            first_row = next(rows, None)
 
-            if json_data:
+            if first_row is not None:
                 output_file = os.path.join(output_directory, f"{table}.json")
 
-                with open(output_file, "w") as file:
-                    json.dump(json_data, file, indent=4)
+                # Write the array one element at a time so the table is never held in memory
+                with open(output_file, "wb", buffering=self.EXPORT_BUFFER_SIZE) as file:
+                    file.write(opening)
+                    file.write(first_row)
+                    while True:
+                        batch = list(itertools.islice(rows, self.FETCH_SIZE))
+                        if not batch:
+                            break
+                        file.write(b"".join([separator + row for row in batch]))
+                    file.write(closing)
 
                 print(f"Exported {table} table as JSON to: {output_file}")
 
@@ -953,17 +1407,16 @@ class ChatGPTTool:
         template_path = os.path.join('templates', 'index.html')
 
         # Read the index template HTML
-        with open(template_path, 'r', encoding='utf-8') as file:
-            index_template = file.read()
+        index_template = self.load_template(template_path)
 
         rows = ""
         for conversation in all_conversations:
-            date = datetime.fromtimestamp(conversation.create_time).strftime(Conversation.TIME_FORMAT)
+            date = Conversation.format_time(conversation.create_time)
             row = f"""
             <tr>
                 <td><a href="{conversation.id}.html">View Conversation</a></td>
                 <td>{date}</td>
-                <td>{conversation.title}</td>
+                <td>{conversation.title or ''}</td>
             </tr>
             """
             rows += row
@@ -995,7 +1448,8 @@ class ChatGPTTool:
             print("Warning: JSON data is empty.")
             return
 
-        if not isinstance(json_data, list) or not all(isinstance(item, dict) for item in json_data):
+        # map() keeps the per-record type check in C and still stops at the first non-dict
+        if not isinstance(json_data, list) or not all(map(isinstance, json_data, itertools.repeat(dict))):
             print("Warning: Invalid JSON data format. Expected a list of dictionaries.")
             return
 
@@ -1025,23 +1479,17 @@ class ChatGPTTool:
 
         exit_code = self.EXIT_SUCCESS  # Initialize with success
 
-        if self.args.subcommand == "import":
-            exit_code = self.import_data(self.args.db_name, self.args.path)
-        elif self.args.subcommand == "show":
-            exit_code = self.print_tables(self.args.db_name)
-        elif self.args.subcommand == "info":
-            exit_code = self.info(self.args.db_name)
-        elif self.args.subcommand == "export":
-            exit_code = self.export_conversations(self.args.db_name, self.args.prefixes, self.args.format)
-        elif self.args.subcommand == "print":
-            exit_code = self.print_conversations(self.args.db_name, self.args.prefixes, self.args.style)
-        elif self.args.subcommand == "inspect":
-            exit_code = self.inspect_data(self.args.path)
-
         # to do:
         #     - add text search for conversations and messages
         #     - filename globbing for CLI arguments
 
+        subcommand = self.subcommands.get(self.args.subcommand)
+        if subcommand:
+            handler, arg_names = subcommand
+            try:
+                exit_code = handler(*(getattr(self.args, name) for name in arg_names))
+            finally:
+                self.close_connection()  # the shared query connection, if a handler opened it
         else:
             self.parser.print_help()
             exit_code = self.EXIT_USAGE_ERROR  # Set exit code to indicate a usage error
@@ -2,6 +2,9 @@ import unittest
 import subprocess
 import tempfile
 import shutil
+import os
+import sys
+import json
 
 from src.chatgpt_tool import ChatGPTTool
 
@@ -29,6 +32,25 @@ class CLITestCase(unittest.TestCase):
         self.assertIn("subcommand: import", result.stdout)
         self.assertEqual(result.returncode, 0)
 
+    def test_dump_command_compact(self):
+        # --compact writes each table as a single line with no indentation
+        data = [{'id': 'alice', 'email': 'alice@example.com'}, {'id': 'bob', 'email': 'bob@example.com'}]
+        json_path = os.path.join(self.data_dir, 'user.json')
+        with open(json_path, 'w') as f:
+            json.dump(data, f)
+        db_path = os.path.join(self.data_dir, self.db_name)
+        self.tool.import_data(db_path, json_path)
+
+        script = os.path.abspath(os.path.join("src", "chatgpt_tool.py"))
+        result = subprocess.run([sys.executable, script, "-db", db_path, "dump", "--compact"], cwd=self.data_dir, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0)
+
+        with open(os.path.join(self.data_dir, "export", "user.json"), 'rb') as f:
+            content = f.read()
+        self.assertNotIn(b"\n", content)
+        self.assertNotIn(b"  ", content)
+        self.assertEqual(json.loads(content), data)
+
     # More test methods...
 
 if __name__ == '__main__':
@@ -4,6 +4,8 @@ import json
 import sqlite3
 from tempfile import TemporaryDirectory
 from src.chatgpt_tool import ChatGPTTool  # Adjust the import based on your module structure
+from .data_generator import DataGenerator
+from .test_import import ImportTestCase
 
 class TestChatGPTToolExport(unittest.TestCase):
 
@@ -88,5 +90,95 @@ class TestChatGPTToolExport(unittest.TestCase):
             self.assertIn("assistant: Hi there!", content)
             self.assertIn("</pre></body></html>", content)
 
+class TestExportImportedConversations(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tool.EXPORT_PATH = os.path.join(self.data_dir, 'export')
+
+    def test_export_untitled_conversation_as_html(self):
+        # A JSON null title is stored as NULL and must not stop the export
+        conversation = DataGenerator.generate_conversation()
+        conversation['title'] = None
+        file_path = self.create_temp_json_file([conversation], 'conversations.json')
+        self.tool.import_data(self.db_path, file_path)
+
+        self.tool.export_conversations(self.db_path, [conversation['id']], export_format='html')
+
+        self.assertTrue(os.path.exists(os.path.join(self.tool.EXPORT_PATH, f"{conversation['id']}.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.tool.EXPORT_PATH, 'index.html')))
+
+    def import_conversations(self, count):
+        conversations = []
+        for i in range(count):
+            conversation = DataGenerator.generate_conversation()
+            conversation['id'] = f'conv{i}'
+            conversations.append(conversation)
+        file_path = self.create_temp_json_file(conversations, 'conversations.json')
+        self.tool.import_data(self.db_path, file_path)
+        return conversations
+
+    def test_export_several_conversations(self):
+        # Every conversation gets its own file from the export thread pool
+        conversations = self.import_conversations(6)
+
+        for export_format, extension in (('text', 'txt'), ('json', 'json')):
+            self.tool.export_conversations(self.db_path, ['conv'], export_format=export_format)
+            for conversation in conversations:
+                output_file = os.path.join(self.tool.EXPORT_PATH, f"{conversation['id']}.{extension}")
+                self.assertTrue(os.path.exists(output_file), output_file)
+
+        with open(os.path.join(self.tool.EXPORT_PATH, 'conv4.json'), 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['mapping'], conversations[4]['mapping'])
+
+    def test_export_writer_failure_reaches_caller(self):
+        # An exception raised in a worker thread is re-raised by export_conversations
+        self.import_conversations(6)
+        write_conversation_as_json = self.tool.write_conversation_as_json
+
+        def failing_write(conversation, *args):
+            if conversation.id == 'conv3':
+                raise OSError("disk full")
+            write_conversation_as_json(conversation, *args)
+
+        self.tool.write_conversation_as_json = failing_write
+        with self.assertRaises(OSError):
+            self.tool.export_conversations(self.db_path, ['conv'], export_format='json')
+
+    def test_fetch_conversations_with_null_id(self):
+        # A stored row whose id is NULL is still fetched instead of being dropped
+        with self.cursor_context() as cursor:
+            cursor.execute("CREATE TABLE conversations (id TEXT PRIMARY KEY, create_time, title)")
+            cursor.executemany("INSERT INTO conversations VALUES (?, ?, ?)", [(None, 1.0, 'untracked'), ('conv1', 2.0, 'tracked')])
+            self.conn.commit()
+
+            conversations = self.tool.get_matching_conversations(cursor)
+            fetched = list(self.tool.fetch_conversations(cursor, conversations))
+
+        self.assertEqual([data['title'] for _, data in fetched], ['untracked', 'tracked'])
+
+    def test_export_table_as_json_round_trip(self):
+        # Rows written one at a time still read back as the original JSON array
+        data = [{'id': f'user{i}', 'email': f'user{i}@example.com', 'rating': i / 2, 'metadata': None} for i in range(5)]
+        file_path = self.create_temp_json_file(data, 'user.json')
+        self.tool.import_data(self.db_path, file_path)
+
+        self.tool.export_database_as_json(self.db_path, self.tool.EXPORT_PATH)
+
+        with open(os.path.join(self.tool.EXPORT_PATH, 'user.json'), 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), data)
+
+class TestFormatting(unittest.TestCase):
+    def setUp(self):
+        self.tool = ChatGPTTool()
+
+    def test_format_row_matches_truncated_str(self):
+        rows = [(), ('abc',), ('alice', 2.5, None), ('x' * 500, 1), (1, 'y' * 50, 'z'),
+                ("abcdefghijklmnop'",), ('abcdefghijklmnop"',), ("abc'defghijklmnop\"",)]
+        for row in rows:
+            for max_length in (10, 40, 77, 1000):
+                expected = self.tool.truncate_string(str(row), max_length)
+                self.assertEqual(self.tool.format_row(row, max_length), expected)
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,10 @@ import shutil
 import os
 import json
 import sqlite3
-from src.chatgpt_tool import ChatGPTTool
+import zipfile
+import io
+from contextlib import redirect_stdout
+from src.chatgpt_tool import ChatGPTTool, ijson
 from .test_import import ImportTestCase
 from .data_generator import DataGenerator
 
@@ -20,6 +23,33 @@ class TestDataTraveral(ImportTestCase):
     # query_table(table_name, condition_field=None, condition_value=None, fetch_one=False)
     # query_single_value(table_name, condition_field, condition_value, value_field)
 
+    def test_column_names_info_and_show(self):
+        # Columns read with one pragma_table_info join match the per-table PRAGMA and feed info/show
+        self.tool.import_data(self.tool.db_path, self.create_temp_json_file({'id': 'alice', 'email': 'alice@example.com'}, 'user.json'))
+        self.tool.import_data(self.tool.db_path, self.create_temp_json_file([{'rating': 1, 'id': 'f1', 'note': None}], 'feedback.json'))
+
+        expected = {
+            'schema': ['hash_value', 'table_name', 'column_names'],
+            'user': ['id', 'email'],
+            'feedback': ['id', 'rating', 'note'],
+        }
+        with self.cursor_context() as cursor:
+            self.assertEqual(self.tool.get_all_column_names(cursor), expected)
+            for table_name, column_names in expected.items():
+                self.assertEqual(self.tool.get_column_names(cursor, table_name), column_names)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.tool.info(self.tool.db_path)
+        self.assertIn("Number of Tables: 3", output.getvalue())
+        self.assertIn("Table Name: user\nColumn Names: id, email\nNumber of Rows: 1\n", output.getvalue())
+        self.assertIn("Table Name: feedback\nColumn Names: id, rating, note\nNumber of Rows: 1\n", output.getvalue())
+
+        output = io.StringIO()
+        self.tool.print_tables(self.tool.db_path, file_handle=output)
+        self.assertIn("Table: user\n['id', 'email']\n('alice', 'alice@example.com')\n", output.getvalue())
+        self.assertIn("Table: feedback\n['id', 'rating', 'note']\n('f1', 1, None)\n", output.getvalue())
+
     def test_import_empty_json_file(self):
         # Test importing an empty JSON file
         data = {}
@@ -45,6 +75,32 @@ class TestDataTraveral(ImportTestCase):
         email = self.tool.query_single_value("single", "id", "alice", "email")
         self.assertEqual(email, 'alice@example.com')
 
+    def test_import_null_value(self):
+        # A JSON null is stored as NULL rather than the string 'None'
+        data = {'id': 'alice', 'email': 'alice@example.com', 'phone_number': None}
+        file_path = self.create_temp_json_file(data, 'nulls.json')
+
+        self.tool.import_data(self.tool.db_path, file_path)
+
+        result = self.tool.query_table("nulls", "id", "alice", fetch_one=True)
+        self.assertIsNone(result['phone_number'])
+
+    def test_import_null_keys_twice(self):
+        # Rows with a null key are still deduplicated when the same file is imported again
+        with_id = [{'id': None, 'email': 'nobody@example.com'}, {'id': 'jack', 'email': None}]
+        without_id = [{'conversation_id': 'c1', 'rating': None}, {'conversation_id': None, 'rating': 'thumbsUp'}]
+        file_paths = [self.create_temp_json_file(with_id, 'null_id.json'),
+                      self.create_temp_json_file(without_id, 'null_compound_key.json')]
+
+        for _ in range(2):
+            for file_path in file_paths:
+                self.tool.import_data(self.tool.db_path, file_path)
+
+        with self.cursor_context() as cursor:
+            self.assertEqual(self.tool.get_table_count(cursor, "null_id"), len(with_id))
+            self.assertEqual(self.tool.get_table_count(cursor, "null_compound_key"), len(without_id))
+        self.assertIsNone(self.tool.query_table("null_id", "id", "jack", fetch_one=True)['email'])
+
     def test_import_empty_json_list(self):
         # Test importing an empty JSON list
         data = []
@@ -72,6 +128,85 @@ class TestDataTraveral(ImportTestCase):
         email_carol = self.tool.query_single_value("list_with_objects", "id", 'carol', "email")
         self.assertEqual(email_carol, data[1]["email"])
 
+    def test_import_json_list_with_bad_object(self):
+        # A failing object is rolled back without losing the rest of the file
+        data = [
+            {'id': 'dave', 'email': 'dave@example.com'},
+            {'id': 'erin', 'bad column': 'erin@example.com'},
+            {'id': 'faye', 'email': 'faye@example.com'}
+        ]
+        file_path = self.create_temp_json_file(data, 'list_with_bad_object.json')
+
+        self.tool.import_data(self.tool.db_path, file_path)
+
+        self.assertTrue(self.tool.check_row_in_table("list_with_bad_object", "id", "dave"))
+        self.assertTrue(self.tool.check_row_in_table("list_with_bad_object", "id", "faye"))
+        with self.cursor_context() as cursor:
+            self.assertFalse(self.tool.table_exists(cursor, "list_with_bad_object_v2"))
+
+    def test_import_json_list_with_bad_value(self):
+        # A failing object is dropped without losing the same-shaped objects around it
+        data = [
+            {'id': 'gail', 'n': 1},
+            {'id': 'hugo', 'n': 2 ** 70},  # too large for an SQLite INTEGER
+            {'id': 'iris', 'n': 3}
+        ]
+
+        # Hand the objects over directly; not every JSON parser accepts the large integer
+        with self.tool.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self.tool.create_schema_table(cursor)
+            self.tool.load_schema_cache(cursor)
+            self.tool.import_json_data_to_sqlite(conn, data, 'list_with_bad_value.json')
+        conn.close()
+
+        self.assertTrue(self.tool.check_row_in_table("list_with_bad_value", "id", "gail"))
+        self.assertFalse(self.tool.check_row_in_table("list_with_bad_value", "id", "hugo"))
+        self.assertTrue(self.tool.check_row_in_table("list_with_bad_value", "id", "iris"))
+
+    @unittest.skipIf(ijson is None, "ijson is not installed")
+    def test_import_streamed_json_list(self):
+        # Force the streaming branch, and more than one batch, on a small file
+        self.tool.STREAM_THRESHOLD = 0
+        self.tool.IMPORT_BATCH_SIZE = 2
+        data = [{'id': f'user{i}', 'email': f'user{i}@example.com', 'rating': i / 2} for i in range(5)]
+        file_path = self.create_temp_json_file(data, 'streamed.json')
+
+        self.tool.import_data(self.tool.db_path, file_path)
+
+        with self.cursor_context() as cursor:
+            self.assertEqual(self.tool.get_table_count(cursor, "streamed"), len(data))
+        self.assertEqual(self.tool.query_table("streamed", "id", "user3", fetch_one=True), data[3])
+
+    def test_import_multi_row_inserts_with_duplicates(self):
+        # Enough rows for several multi-row INSERTs plus a remainder; repeated ids keep their first row
+        column_count = 3
+        rows_per_insert = self.tool.MAX_SQL_VARIABLES // column_count
+        data = [{'id': f'user{i % 700}', 'n': i, 'tag': f'tag{i}'} for i in range(3 * rows_per_insert + 1)]
+        file_path = self.create_temp_json_file(data, 'many_rows.json')
+
+        self.tool.import_data(self.tool.db_path, file_path)
+
+        with self.cursor_context() as cursor:
+            self.assertEqual(self.tool.get_table_count(cursor, "many_rows"), 700)
+        self.assertEqual(self.tool.query_table("many_rows", "id", "user5", fetch_one=True)['n'], 5)
+        self.assertEqual(self.tool.query_table("many_rows", "id", "user299", fetch_one=True)['n'], 299)
+
+    def test_import_multi_row_inserts_with_uneven_columns(self):
+        # MAX_SQL_VARIABLES is not a multiple of the column count, and the last chunk is partial
+        column_count = 7
+        self.assertNotEqual(self.tool.MAX_SQL_VARIABLES % column_count, 0)
+        rows_per_insert = self.tool.MAX_SQL_VARIABLES // column_count
+        data = [{'id': f'row{i}', **{f'c{j}': i * j for j in range(1, column_count)}} for i in range(2 * rows_per_insert + 16)]
+        file_path = self.create_temp_json_file(data, 'wide_rows.json')
+
+        self.tool.import_data(self.tool.db_path, file_path)
+
+        with self.cursor_context() as cursor:
+            self.assertEqual(self.tool.get_table_count(cursor, "wide_rows"), len(data))
+        self.assertEqual(self.tool.query_table("wide_rows", "id", data[-1]['id'], fetch_one=True), data[-1])
+        self.assertEqual(self.tool.query_table("wide_rows", "id", data[rows_per_insert]['id'], fetch_one=True), data[rows_per_insert])
+
     def test_import_single_json_file(self):
         # Test importing from a single JSON file
         data = {'id': 'alice', 'email': 'alice@example.com', 'chatgpt_plus_user': 'false', 'phone_number': '+14165551212'}
@@ -120,6 +255,20 @@ class TestDataTraveral(ImportTestCase):
         self.assertTrue(self.tool.check_row_in_table("user1", "id", "carol"))
         self.assertTrue(self.tool.check_row_in_table("user2", "id", "dave"))
 
+    def test_import_zip_with_directory_entry(self):
+        # Members are read in place; directory entries are skipped and nested paths still work
+        data = {'id': 'gina', 'email': 'gina@example.com', 'chatgpt_plus_user': 'false', 'phone_number': '+15145550000'}
+        zip_path = os.path.join(self.data_dir, 'archive.zip')
+        with zipfile.ZipFile(zip_path, 'w') as zip_file:
+            zip_file.writestr('export/', '')
+            zip_file.writestr('export/user.json', json.dumps(data))
+
+        self.tool.import_data(self.tool.db_path, zip_path)
+
+        with self.cursor_context() as cursor:
+            self.assertFalse(self.tool.table_exists(cursor, "export"))
+        self.assertEqual(self.tool.query_table("user", "id", 'gina', fetch_one=True), data)
+
     def test_import_directory_with_json_files(self):
         # Test importing from a directory containing JSON files
         data1 = {'id': 'emma', 'email': 'emma@example.com', 'chatgpt_plus_user': 'false', 'phone_number': '+19876543210'}
@@ -133,6 +282,18 @@ class TestDataTraveral(ImportTestCase):
         self.assertTrue(self.tool.check_row_in_table("user1", "id", "emma"))
         self.assertTrue(self.tool.check_row_in_table("user2", "id", "frank"))
 
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks are not supported")
+    def test_import_directory_with_symlink_cycle(self):
+        # A symlink back to a parent directory is not followed
+        data = {'id': 'kate', 'email': 'kate@example.com', 'chatgpt_plus_user': 'false', 'phone_number': '+16045550000'}
+        data_dir = os.path.join(self.data_dir, 'linked_data')
+        os.makedirs(data_dir)
+        self.create_temp_json_file(data, os.path.join(data_dir, 'user.json'))
+        os.symlink(data_dir, os.path.join(data_dir, 'loop'))
+
+        self.tool.import_data(self.tool.db_path, data_dir)
+        self.assertTrue(self.tool.check_row_in_table("user", "id", "kate"))
+
     def test_import_directory_with_archives(self):
         # Test importing from a directory containing ZIP archives
         data1 = {'id': 'grace', 'email': 'grace@example.com', 'chatgpt_plus_user': 'false', 'phone_number': '+9876543210'}
@@ -129,6 +129,27 @@ class TestSchemaHandling(ImportTestCase):
         # Verify that the mapped table name was used
         # You need to implement this verification based on your ChatGPTTool's methods
 
+    def test_matching_conversations_across_versioned_tables(self):
+        # The same id in two versions of the table is listed once, from the older table
+        data1 = [{'id': 'conv1', 'title': 'first', 'create_time': '100'},
+                 {'id': 'conv2', 'title': 'second', 'create_time': '20'}]
+        filename = self.create_temp_json_file(data1, "conversations.json")
+        self.tool.import_data(self.db_path, filename)
+
+        data2 = [{'id': 'conv1', 'title': 'first again', 'create_time': '100', 'update_time': '200'},
+                 {'id': 'conv3', 'title': 'third', 'create_time': 5.5, 'update_time': 6.5}]
+        filename = self.create_temp_json_file(data2, "conversations.json")
+        self.tool.import_data(self.db_path, filename)
+
+        with self.cursor_context() as cursor:
+            self.assertTrue(self.tool.table_exists(cursor, "conversations_v2"))
+            conversations = self.tool.get_matching_conversations(cursor, ['conv'])
+
+        # Ordered by numeric create_time, even where it was stored as text
+        self.assertEqual([c.id for c in conversations], ['conv3', 'conv2', 'conv1'])
+        self.assertEqual(conversations[2].table, 'conversations')
+        self.assertEqual(conversations[2].title, 'first')
+
     def test_schema_cache(self):
         pass
 